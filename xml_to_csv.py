@@ -1,121 +1,149 @@
 import re
 import csv
-from datetime import datetime
+import sys
 
-def parse_event_logs(input_file, output_file):
+# Map single-line field labels (text before the first colon) to CSV column indexes
+_LINE_FIELDS = {
+    'Date': 0,              # eventdate
+    'Computer': 1,          # hostname
+    'New Process ID': 3,    # processid
+    'New Process Name': 4,  # image
+    'Hashes': 6,            # hashes
+}
+
+# Collapses runs of whitespace in wrapped command lines
+_RE_WS = re.compile(r'\s+')
+
+# I/O buffer size for the input log and the output CSV
+_BUFFER_SIZE = 1 << 20
+
+# Number of rows handed to the CSV writers per writerows() call
+_BATCH_SIZE = 1024
+
+def _iter_events(lines):
+    """
+    Group log lines into events, one list of lines per event.
+    
+    A new event starts at every line beginning with "Log Name:".
+    """
+    current_event_lines = []
+    for line in lines:
+        if line.startswith('Log Name:') and current_event_lines:
+            yield current_event_lines
+            current_event_lines = []
+        current_event_lines.append(line)
+    if current_event_lines:
+        yield current_event_lines
+
+
+def parse_event_logs(input_file, output_file, verbose=False):
     """
     Parse Windows Security Event logs and extract key fields to CSV.
     
     Args:
         input_file: Path to input file containing event logs
         output_file: Path to output CSV file for results
-    """
+        verbose: Also echo the CSV rows to stdout as they are written
     
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    Returns:
+        Number of events written to the CSV file
+    """
     
-    # Split content by "Log Name:" to separate individual events
-    # This regex finds "Log Name:" at the start of a line
-    events = re.split(r'\n(?=Log Name:)', content)
-    events = [e.strip() for e in events if e.strip()]  # Remove empty entries
+    # Define CSV columns
+    fieldnames = ['eventdate', 'hostname', 'user', 'processid', 'image', 'processcommandline', 'hashes']
     
-    parsed_events = []
+    count = 0
     
-    for event in events:
-        event_data = {}
-        
-        # Extract Date
-        date_match = re.search(r'Date:\s+(.+?)(?:\n|$)', event)
-        if date_match:
-            event_data['eventdate'] = date_match.group(1).strip()
-        else:
-            event_data['eventdate'] = ''
-        
-        # Extract Computer (Hostname)
-        hostname_match = re.search(r'Computer:\s+(.+?)(?:\n|$)', event)
-        if hostname_match:
-            event_data['hostname'] = hostname_match.group(1).strip()
-        else:
-            event_data['hostname'] = ''
-        
-        # Extract User (Account Name from Creator Subject)
-        user_match = re.search(r'Creator Subject:.*?Account Name:\s+(.+?)(?:\n|$)', event, re.DOTALL)
-        if user_match:
-            event_data['user'] = user_match.group(1).strip()
-        else:
-            event_data['user'] = ''
-        
-        # Extract Process ID (New Process ID)
-        pid_match = re.search(r'New Process ID:\s+(.+?)(?:\n|$)', event)
-        if pid_match:
-            event_data['processid'] = pid_match.group(1).strip()
-        else:
-            event_data['processid'] = ''
-        
-        # Extract Image (New Process Name)
-        image_match = re.search(r'New Process Name:\s+(.+?)(?:\n|$)', event)
-        if image_match:
-            event_data['image'] = image_match.group(1).strip()
-        else:
-            event_data['image'] = ''
+    # Stream the input one event at a time, writing rows out in batches
+    with open(input_file, 'r', encoding='utf-8', buffering=_BUFFER_SIZE) as f, \
+            open(output_file, 'w', newline='', encoding='utf-8', buffering=_BUFFER_SIZE) as csvfile:
+        writers = [csv.writer(csvfile)]
+        if verbose:
+            # Echo to the console with plain newlines, as print() did
+            writers.append(csv.writer(sys.stdout, lineterminator='\n'))
+        for writer in writers:
+            writer.writerow(fieldnames)
         
-        # Extract Process Command Line
-        cmdline_match = re.search(r'Process Command Line:\s+(.+?)(?:\n\n|$)', event, re.DOTALL)
-        if cmdline_match:
-            # Clean up the command line - remove extra whitespace and newlines
-            cmdline = cmdline_match.group(1).strip()
-            cmdline = ' '.join(cmdline.split())
-            event_data['processcommandline'] = cmdline
-        else:
-            event_data['processcommandline'] = ''
+        # Bind per-line lookups to locals for the hot loop below
+        num_fields = len(fieldnames)
+        line_field = _LINE_FIELDS.get
         
-        # Extract Hashes (if present)
-        hash_match = re.search(r'Hashes:\s+(.+?)(?:\n|$)', event)
-        if hash_match:
-            event_data['hashes'] = hash_match.group(1).strip()
-        else:
-            event_data['hashes'] = ''
+        batch = []
+        for event_lines in _iter_events(f):
+            row = [''] * num_fields
+            found = False  # Set once any field is extracted
+            in_creator_subject = False
+            in_cmdline = False
+            cmdline_lines = []
+            
+            # Single pass over the event, dispatching on each line's label
+            for raw_line in event_lines:
+                line = raw_line.strip()
+                
+                # The command line may wrap; it runs until the next empty line
+                if in_cmdline:
+                    if raw_line.strip('\r\n'):
+                        cmdline_lines.append(line)
+                        continue
+                    in_cmdline = False
+                
+                key, _, value = line.partition(':')
+                col = line_field(key)
+                if col is not None:
+                    # Keep the first occurrence of each label
+                    value = value.strip()
+                    if value and not row[col]:
+                        row[col] = value
+                        found = True
+                elif key == 'Creator Subject':
+                    in_creator_subject = True
+                elif key == 'Account Name' and in_creator_subject:
+                    # User is the first Account Name under Creator Subject
+                    value = value.strip()
+                    if value:
+                        row[2] = value  # user
+                        found = True
+                    in_creator_subject = False
+                elif key == 'Process Command Line' and not cmdline_lines:
+                    in_cmdline = True
+                    cmdline_lines.append(value)
+            
+            if cmdline_lines:
+                # Clean up the command line - remove extra whitespace and newlines
+                cmdline = ' '.join(cmdline_lines)
+                cmdline = _RE_WS.sub(' ', cmdline).strip()
+                if cmdline:
+                    row[5] = cmdline  # processcommandline
+                    found = True
+            
+            if found:  # Only add if we extracted some data
+                batch.append(row)
+                count += 1
+                if len(batch) >= _BATCH_SIZE:
+                    for writer in writers:
+                        writer.writerows(batch)
+                    batch.clear()
         
-        if any(event_data.values()):  # Only add if we extracted some data
-            parsed_events.append(event_data)
-    
-    # Define CSV columns
-    fieldnames = ['eventdate', 'hostname', 'user', 'processid', 'image', 'processcommandline', 'hashes']
-    
-    # Write to CSV file
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(parsed_events)
-    
-    # Print to console in CSV format
-    print(','.join(fieldnames))
-    for event in parsed_events:
-        row = []
-        for field in fieldnames:
-            value = event.get(field, '')
-            # Quote fields that contain commas or quotes
-            if ',' in value or '"' in value:
-                value = f'"{value.replace(chr(34), chr(34)+chr(34))}"'
-            row.append(value)
-        print(','.join(row))
+        for writer in writers:
+            writer.writerows(batch)
     
     print(f"\n{'='*80}")
-    print(f"Successfully parsed {len(parsed_events)} events")
+    print(f"Successfully parsed {count} events")
     print(f"Results saved to: {output_file}")
     print(f"{'='*80}")
     
-    return parsed_events
+    return count
 
 
 if __name__ == "__main__":
     # Configuration
     input_file = "event_logs.txt"  # Change this to your input file path
     output_file = "parsed_events.csv"  # Change this to your desired output CSV file
+    verbose = False  # Set to True to also print the parsed rows to the console
     
     try:
-        parsed_events = parse_event_logs(input_file, output_file)
-        print(f"\nTotal events parsed: {len(parsed_events)}")
+        count = parse_event_logs(input_file, output_file, verbose)
+        print(f"\nTotal events parsed: {count}")
     except FileNotFoundError:
         print(f"Error: Input file '{input_file}' not found.")
         print("Please create the file and paste your event logs into it.")